@@ -2,8 +2,18 @@ import sys
 import os
 import random
 import hashlib
+import shutil
 import tempfile
+import subprocess
 import threading
+import multiprocessing
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+import cv2
+import numpy as np
 import pandas as pd
 
 from PyQt5.QtCore import Qt, QRunnable, QThreadPool, QObject, pyqtSignal
@@ -13,174 +23,425 @@ from PyQt5.QtWidgets import (
 )
 
 # Import video clip classes from MoviePy.
-from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip, VideoFileClip
-from moviepy.audio.fx import audio_loop
+from moviepy.editor import ImageClip, VideoClip, concatenate_videoclips, AudioFileClip, VideoFileClip
+from moviepy.audio.AudioClip import AudioArrayClip, CompositeAudioClip
+from moviepy.config import get_setting
 
 # --------------------- Global Disk Cache Setup ---------------------
 # Use a dedicated subfolder in the system temporary directory.
 DISK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "video_export_cache")
 os.makedirs(DISK_CACHE_DIR, exist_ok=True)
-# Lock to protect concurrent disk cache operations.
-DISK_CACHE_LOCK = threading.Lock()
+
+# --------------------- Image Preprocessing Helpers ---------------------
+def fit_frame(frame, width, height):
+    """
+    Center-crop and/or pad frame with black to exactly width x height using plain NumPy slicing.
+    Pure crops return a view; padding allocates the output once and copies the frame into it.
+    """
+    h, w = frame.shape[:2]
+    src_x, src_y = max(0, (w - width) // 2), max(0, (h - height) // 2)
+    if w >= width and h >= height:
+        return frame[src_y:src_y + height, src_x:src_x + width]
+    dst_x, dst_y = max(0, (width - w) // 2), max(0, (height - h) // 2)
+    copy_w, copy_h = min(w, width), min(h, height)
+    out = np.zeros((height, width) + frame.shape[2:], dtype=frame.dtype)
+    out[dst_y:dst_y + copy_h, dst_x:dst_x + copy_w] = frame[src_y:src_y + copy_h, src_x:src_x + copy_w]
+    return out
+
+def cv_resize_pad(path, width, height, out_path):
+    """
+    Resize the image at path to the target height (keeping its aspect ratio) with OpenCV, then
+    center-crop or pad with black to exactly width x height and save the RGB uint8 array to out_path
+    as raw .npy, so it can later be memory-mapped instead of decoded.
+    """
+    # np.fromfile + imdecode instead of cv2.imread so non-ASCII paths also work on Windows.
+    img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not decode image: {path}")
+    h, w = img.shape[:2]
+    new_w = max(1, int(round(w * height / h)))
+    # Area interpolation for downscaling avoids aliasing; linear is enough for upscaling.
+    interpolation = cv2.INTER_AREA if height < h else cv2.INTER_LINEAR
+    img = cv2.resize(img, (new_w, height), interpolation=interpolation)
+    frame = cv2.cvtColor(fit_frame(img, width, height), cv2.COLOR_BGR2RGB)
+    # Write through a file object so np.save does not append ".npy" to the temp name.
+    with open(out_path, "wb") as f:
+        np.save(f, frame)
+
+def cache_path(cache_key, extension):
+    """Return the disk cache path for cache_key (hashed, since keys contain full paths)."""
+    hash_key = hashlib.blake2b(cache_key.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(DISK_CACHE_DIR, f"{hash_key}{extension}")
+
+def build_cache_file(cache_file, build):
+    """
+    Create cache_file by calling build(path) unless it already exists. Entries are
+    content-addressed, so racing builders produce identical files; writing to a private temp file
+    and renaming it into place means readers never see a partial file.
+    """
+    if os.path.exists(cache_file):
+        return
+    tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        build(tmp_file)
+        os.replace(tmp_file, cache_file)
+    except PermissionError:
+        # Windows refuses to replace a file another worker has open; its copy is just as good.
+        if not os.path.exists(cache_file):
+            raise
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def image_cache_files(file_paths, width, height):
+    """
+    Map each path in file_paths to its width x height cache file in a single pass, so the key
+    hashing happens once per export instead of once per use inside every job.
+    """
+    return {file_path: cache_path(f"{file_path}_{width}_{height}", ".npy") for file_path in file_paths}
+
+def get_processed_image(file_path, width, height, cache_file=None):
+    """
+    Return the path of the disk-cached width x height version of file_path, building it first
+    if it is not cached yet. cache_file may be passed in when it was already computed by
+    image_cache_files.
+    """
+    if cache_file is None:
+        cache_file = cache_path(f"{file_path}_{width}_{height}", ".npy")
+    build_cache_file(cache_file, lambda tmp_file: cv_resize_pad(file_path, width, height, tmp_file))
+    return cache_file
+
+@lru_cache(maxsize=64)
+def load_processed_frame(cache_file):
+    """
+    Memory-map a cached frame as a read-only RGB uint8 array; nothing is decoded, and every clip
+    and worker process using the same image shares the same page-cache pages. Memoised so
+    reusing an image within a worker does not even reopen the file.
+    """
+    return np.load(cache_file, mmap_mode="r")
+
+# --------------------- Audio Pre-decoding ---------------------
+AUDIO_FPS = 44100
+
+def decode_audio_once(audio_file):
+    """
+    Decode audio_file to float32 PCM stored as a .npy in the disk cache and return its path.
+    Export workers memory-map this file instead of each re-decoding the source audio.
+    """
+    stat = os.stat(audio_file)
+    cache_file = cache_path(f"{audio_file}_{stat.st_size}_{stat.st_mtime_ns}_{AUDIO_FPS}", ".npy")
+
+    def build(tmp_file):
+        audio_clip = AudioFileClip(audio_file, fps=AUDIO_FPS)
+        try:
+            # Stack the chunks from a list ourselves: moviepy's to_soundarray passes a generator to
+            # np.vstack, which NumPy 1.24+ rejects for anything longer than one chunk.
+            chunks = [chunk.astype(np.float32) for chunk in
+                      audio_clip.iter_chunks(fps=AUDIO_FPS, chunksize=50000, logger=None)]
+            pcm = np.concatenate(chunks, axis=0)
+        finally:
+            audio_clip.close()
+        # Write through a file object so np.save does not append ".npy" to the temp name.
+        with open(tmp_file, "wb") as f:
+            np.save(f, pcm)
+
+    build_cache_file(cache_file, build)
+    return cache_file
+
+# --------------------- Encoder Selection ---------------------
+# Preset MoviePy passes to every encoder via write_videofile.
+ENCODER_PRESET = "ultrafast"
+# Hardware H.264 encoders to try, in order of preference, with the extra ffmpeg arguments each
+# needs. They override MoviePy's own "-preset" (ffmpeg keeps the last one given).
+HARDWARE_ENCODERS = {
+    "darwin": [
+        ("h264_videotoolbox", ["-b:v", "6M", "-pix_fmt", "yuv420p"]),
+    ],
+    "default": [
+        ("h264_nvenc", ["-preset", "p1", "-rc", "vbr", "-b:v", "6M", "-pix_fmt", "yuv420p"]),
+        ("h264_qsv", ["-preset", "veryfast", "-b:v", "6M", "-pix_fmt", "nv12"]),
+    ],
+}
+SOFTWARE_ENCODER = ("libx264", None)
+
+@lru_cache(maxsize=None)
+def detect_video_encoder():
+    """
+    Return (codec, ffmpeg_params) for the first hardware encoder that can actually encode a test
+    frame on this machine, falling back to libx264. Builds often list encoders (e.g. NVENC) even
+    when no matching GPU is present, so a trial encode is the only reliable check.
+    """
+    popen_params = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if os.name == "nt":
+        popen_params["creationflags"] = 0x08000000  # CREATE_NO_WINDOW
+    probe_size = (256, 256)
+    probe_frame = bytes(probe_size[0] * probe_size[1] * 3)
+    for codec, params in HARDWARE_ENCODERS.get(sys.platform, HARDWARE_ENCODERS["default"]):
+        # Same input and option order as MoviePy's FFMPEG_VideoWriter, so the probe exercises the
+        # command line the real export will run (only the output goes to the null muxer).
+        cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-vcodec", "rawvideo", "-s", "%dx%d" % probe_size,
+               "-pix_fmt", "rgb24", "-r", "30", "-an", "-i", "-",
+               "-vcodec", codec, "-preset", ENCODER_PRESET] + params + ["-f", "null", "-"]
+        try:
+            if subprocess.run(cmd, input=probe_frame, timeout=20, **popen_params).returncode == 0:
+                return codec, params
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return SOFTWARE_ENCODER
 
 # --------------------- Worker Signals ---------------------
+# Emitted from pool / executor callback threads; Qt queues delivery onto the UI thread.
 class WorkerSignals(QObject):
     progress = pyqtSignal(int)  # Emit video index finished.
     error = pyqtSignal(str)     # Emit error message.
     finished = pyqtSignal()     # Emit when a task is done.
+    job_done = pyqtSignal()     # Emit once per completed export job (which may cover several videos).
+
+# --------------------- Encoder Probe Task ---------------------
+class EncoderProbeTask(QRunnable):
+    def __init__(self):
+        """
+        Run detect_video_encoder off the UI thread; its result is memoised, so the finished
+        handler can read it back instantly.
+        """
+        super().__init__()
+        self.signals = WorkerSignals()
+
+    def run(self):
+        detect_video_encoder()
+        self.signals.finished.emit()
+
+# --------------------- Audio Decode Task ---------------------
+class AudioDecodeTask(QRunnable):
+    def __init__(self, audio_file):
+        """
+        Run decode_audio_once off the UI thread; audio_pcm holds the cached .npy path on success.
+        """
+        super().__init__()
+        self.audio_file = audio_file
+        self.audio_pcm = None
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            self.audio_pcm = decode_audio_once(self.audio_file)
+        except Exception as e:
+            self.signals.error.emit(f"Failed to decode audio file:\n{e}")
+        self.signals.finished.emit()
+
+# --------------------- Preprocess Task ---------------------
+class PreprocessTask(QRunnable):
+    def __init__(self, file_path, width, height, cache_file):
+        """
+        Warm the disk cache for one (file_path, width, height) before any video is encoded.
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.width = width
+        self.height = height
+        self.cache_file = cache_file
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            get_processed_image(self.file_path, self.width, self.height, self.cache_file)
+        except Exception as e:
+            # Not fatal here: the export job retries the build and reports the error for its video.
+            print(f"Failed to preprocess {self.file_path}: {e}")
+        self.signals.finished.emit()
 
 # --------------------- Crossfade Helper ---------------------
 def crossfade_consecutive_clips(clips, fade_duration=1.0):
     """
     Overlap the last fade_duration seconds of the previous clip with the first fade_duration
-    seconds of the next clip. Each clip (except the first) is processed with .crossfadein(fade_duration).
-    The clips are concatenated with negative padding equal to fade_duration.
+    seconds of the next clip. Frames are blended directly with NumPy instead of going through
+    MoviePy's CompositeVideoClip. Unlike CompositeVideoClip, this blend does not position or
+    resize anything: every clip must already be exactly width x height, which fit_frame and the
+    preprocessed image cache guarantee.
     """
     if not clips:
         return None
     if len(clips) == 1:
         return clips[0]
-    new_clips = [clips[0]]
-    for clip in clips[1:]:
-        new_clips.append(clip.crossfadein(fade_duration))
-    final = concatenate_videoclips(new_clips, method="compose", padding=-fade_duration)
+    starts = [0]
+    for clip in clips[:-1]:
+        starts.append(starts[-1] + clip.duration - fade_duration)
+    duration = starts[-1] + clips[-1].duration
+
+    def make_frame(t):
+        idx = max(bisect_right(starts, t) - 1, 0)
+        frame = clips[idx].get_frame(t - starts[idx])
+        elapsed = t - starts[idx]
+        if idx > 0 and elapsed < fade_duration:
+            prev_frame = clips[idx - 1].get_frame(t - starts[idx - 1])
+            # 8.8 fixed-point blend in uint16 keeps the frame pipeline integer-only (no float
+            # upcast); 256 * 255 still fits in 16 bits.
+            alpha_q = int(round(elapsed / fade_duration * 256))
+            blended = (256 - alpha_q) * prev_frame.astype(np.uint16) + alpha_q * frame.astype(np.uint16)
+            frame = (blended >> 8).astype(np.uint8)
+        return frame
+
+    final = VideoClip(make_frame, duration=duration)
+    audio_clips = [clip.audio.set_start(start) for clip, start in zip(clips, starts) if clip.audio is not None]
+    if audio_clips:
+        final = final.set_audio(CompositeAudioClip(audio_clips).set_duration(duration))
     return final
 
-# --------------------- Video Export Task ---------------------
-class VideoExportTask(QRunnable):
-    def __init__(self, base_dir, files_list, export_params, video_idx):
-        """
-        base_dir: Directory where main.py is located.
-        files_list: List of file paths (filtered by category; may be relative).
-        export_params: Dictionary with keys:
-          - images_per_video, width, height, per_image_time, fade_duration,
-            audio_file, output_folder, crossfade (bool), closing_image (optional)
-        video_idx: Integer, the video number (used in output filename).
-        """
-        super().__init__()
-        self.base_dir = base_dir
-        self.files_list = files_list
-        self.export_params = export_params
-        self.video_idx = video_idx
-        self.signals = WorkerSignals()
+# --------------------- Export Planning ---------------------
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi")
 
-    def run(self):
-        try:
-            images_per_video = self.export_params["images_per_video"]
-            width = self.export_params["width"]
-            height = self.export_params["height"]
-            per_image_time = self.export_params["per_image_time"]
-            fade_duration = self.export_params["fade_duration"]
-            audio_file = self.export_params["audio_file"]
-            output_folder = self.export_params["output_folder"]
-            use_crossfade = self.export_params["crossfade"]
-            closing_image = self.export_params.get("closing_image", None)
-
-            # Randomly select files (allow repeats if needed)
-            if len(self.files_list) < images_per_video:
-                sample_files = random.choices(self.files_list, k=images_per_video)
+def is_video_file(file_path):
+    return file_path.lower().endswith(VIDEO_EXTENSIONS)
+
+def resolve_files(base_dir, files_list):
+    """
+    Make every path in files_list absolute (relative to base_dir) and drop the ones that do not
+    exist, so workers never repeat the path handling or the stat calls.
+    """
+    resolved = []
+    for file_path in files_list:
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(base_dir, file_path)
+        if os.path.isfile(file_path):
+            resolved.append(file_path)
+        else:
+            print(f"File not found: {file_path}")
+    return resolved
+
+def sample_files_for_video(files_list, images_per_video):
+    """Randomly select the files for one video (allow repeats if needed)."""
+    if len(files_list) < images_per_video:
+        return random.choices(files_list, k=images_per_video)
+    return random.sample(files_list, images_per_video)
+
+def is_rotational_disk(path):
+    """
+    Best-effort check whether path lives on a spinning disk. Only Linux exposes this cheaply
+    (via sysfs); everywhere else, or if the lookup fails, assume solid-state storage.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        dev = os.stat(path).st_dev
+        block_dir = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+        # A partition has no queue/ of its own; its parent directory is the whole disk.
+        for candidate in (block_dir, os.path.dirname(block_dir)):
+            flag_file = os.path.join(candidate, "queue", "rotational")
+            if os.path.exists(flag_file):
+                with open(flag_file) as f:
+                    return f.read().strip() == "1"
+    except OSError:
+        pass
+    return False
+
+def group_duplicate_videos(video_samples):
+    """
+    Collapse videos whose ordered file selection is identical into one job.
+    video_samples: List of (video_idx, sample_files).
+    Returns a list of (video_idx, sample_files, copy_to) with copy_to listing the duplicates.
+    """
+    jobs = {}
+    for video_idx, sample_files in video_samples:
+        key = tuple(sample_files)
+        if key in jobs:
+            jobs[key][2].append(video_idx)
+        else:
+            jobs[key] = (video_idx, sample_files, [])
+    return list(jobs.values())
+
+# --------------------- Video Export Job ---------------------
+def export_one(sample_files, cache_files, export_params, video_idx, copy_to=()):
+    """
+    Build and encode a single video. Runs in a worker process, so every argument must be
+    picklable and the outcome is reported through the return value rather than Qt signals.
+    sample_files: Ordered list of absolute, existing file paths to use for this video.
+    cache_files: Image path -> cache file (from image_cache_files) for this video's images and
+      the closing image only, so each job pickles just its own entries.
+    export_params: Dictionary with keys:
+      - width, height, per_image_time, fade_duration,
+        audio_pcm (path of the decoded .npy or None), output_folder, crossfade (bool),
+        closing_image (absolute path or None), video_codec, ffmpeg_params
+    video_idx: Integer, the video number (used in output filename).
+    copy_to: Video numbers that drew exactly the same files; they receive a copy of the output.
+    Returns (video_idx, error message or None).
+    """
+    try:
+        width = export_params["width"]
+        height = export_params["height"]
+        per_image_time = export_params["per_image_time"]
+        fade_duration = export_params["fade_duration"]
+        audio_pcm = export_params["audio_pcm"]
+        output_folder = export_params["output_folder"]
+        use_crossfade = export_params["crossfade"]
+        closing_image = export_params.get("closing_image", None)
+
+        clips = []
+        for file_path in sample_files:
+            # If the file is a video, load it as VideoFileClip.
+            if is_video_file(file_path):
+                # Let ffmpeg scale to the target height while decoding (keeping the aspect ratio)
+                # instead of resizing every full-resolution frame in Python.
+                clip = VideoFileClip(file_path, target_resolution=(height, None))
+                # Ensure uniform resolution by cropping/padding each frame if needed.
+                if tuple(clip.size) != (width, height):
+                    clip = clip.fl_image(lambda frame: fit_frame(frame, width, height))
+                clips.append(clip)
             else:
-                sample_files = random.sample(self.files_list, images_per_video)
-
-            clips = []
-            for file_path in sample_files:
-                # Convert to absolute path if needed.
-                if not os.path.isabs(file_path):
-                    file_path = os.path.join(self.base_dir, file_path)
-                if not os.path.isfile(file_path):
-                    print(f"File not found: {file_path}")
-                    continue
-
-                lower_path = file_path.lower()
-                # If the file is a video, load it as VideoFileClip.
-                if lower_path.endswith((".mp4", ".mov", ".avi")):
-                    clip = VideoFileClip(file_path).resize(newsize=(width, height))
-                    # Ensure uniform resolution by cropping/padding if needed.
-                    if clip.w > width:
-                        clip = clip.crop(x_center=clip.w/2, width=width)
-                    elif clip.w < width:
-                        clip = clip.on_color(size=(width, height), color=(0,0,0), pos=('center', 'center'))
-                    clips.append(clip)
-                else:
-                    # Otherwise assume it's an image.
-                    cache_key = f"{file_path}_{width}_{height}"
-                    hash_key = hashlib.md5(cache_key.encode('utf-8')).hexdigest()
-                    cache_file = os.path.join(DISK_CACHE_DIR, f"{hash_key}.png")
-                    with DISK_CACHE_LOCK:
-                        if os.path.exists(cache_file):
-                            processed_file = cache_file
-                        else:
-                            clip_proc = ImageClip(file_path).resize(height=height)
-                            if clip_proc.w > width:
-                                clip_proc = clip_proc.crop(x_center=clip_proc.w/2, width=width)
-                            elif clip_proc.w < width:
-                                clip_proc = clip_proc.on_color(size=(width, height), color=(0, 0, 0), pos=('center', 'center'))
-                            clip_proc.save_frame(cache_file, t=0)
-                            processed_file = cache_file
-                    clip_final = ImageClip(processed_file).set_duration(per_image_time)
-                    clips.append(clip_final)
-
-            # Process closing image (always assumed to be an image) if provided.
-            closing_clip = None
-            if closing_image and closing_image.strip() != "":
-                if not os.path.isabs(closing_image):
-                    closing_image = os.path.join(self.base_dir, closing_image)
-                if os.path.isfile(closing_image):
-                    cache_key_close = f"{closing_image}_{width}_{height}"
-                    hash_key_close = hashlib.md5(cache_key_close.encode('utf-8')).hexdigest()
-                    cache_file_close = os.path.join(DISK_CACHE_DIR, f"{hash_key_close}.png")
-                    with DISK_CACHE_LOCK:
-                        if os.path.exists(cache_file_close):
-                            processed_close = cache_file_close
-                        else:
-                            clip_close = ImageClip(closing_image).resize(height=height)
-                            if clip_close.w > width:
-                                clip_close = clip_close.crop(x_center=clip_close.w/2, width=width)
-                            elif clip_close.w < width:
-                                clip_close = clip_close.on_color(size=(width, height), color=(0, 0, 0), pos=('center', 'center'))
-                            clip_close.save_frame(cache_file_close, t=0)
-                            processed_close = cache_file_close
-                    closing_clip = ImageClip(processed_close).set_duration(3)  # Fixed 3 sec duration
-
-            if not clips:
-                raise ValueError("No valid files to process for video creation.")
-
-            # Build the final clip.
-            if use_crossfade:
-                main_clip = crossfade_consecutive_clips(clips, fade_duration=fade_duration)
-                if closing_clip:
-                    final_clip = concatenate_videoclips([main_clip, closing_clip], method="compose")
-                else:
-                    final_clip = main_clip
+                # Otherwise assume it's an image; the preprocess pass has normally cached it already.
+                processed_file = get_processed_image(file_path, width, height, cache_files.get(file_path))
+                clip_final = ImageClip(load_processed_frame(processed_file)).set_duration(per_image_time)
+                clips.append(clip_final)
+
+        # Process closing image (always assumed to be an image) if provided.
+        closing_clip = None
+        if closing_image:
+            processed_close = get_processed_image(closing_image, width, height, cache_files.get(closing_image))
+            closing_clip = ImageClip(load_processed_frame(processed_close)).set_duration(3)  # Fixed 3 sec duration
+
+        if not clips:
+            raise ValueError("No valid files to process for video creation.")
+
+        # Build the final clip.
+        if use_crossfade:
+            main_clip = crossfade_consecutive_clips(clips, fade_duration=fade_duration)
+            if closing_clip:
+                final_clip = concatenate_videoclips([main_clip, closing_clip], method="chain")
             else:
-                if closing_clip:
-                    clips.append(closing_clip)
-                final_clip = concatenate_videoclips(clips, method="compose")
-
-            # Attach audio if available.
-            if audio_file and os.path.isfile(audio_file):
-                audio_clip = AudioFileClip(audio_file)
-                if audio_clip.duration < final_clip.duration:
-                    audio_clip = audio_loop(audio_clip, duration=final_clip.duration)
-                else:
-                    audio_clip = audio_clip.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(audio_clip)
-
-            output_path = os.path.join(output_folder, f"video_{self.video_idx}.mp4")
-            final_clip.write_videofile(
-                output_path,
-                fps=30,
-                codec="libx264",
-                audio_codec="aac",
-                preset="ultrafast",
-                verbose=False,
-                logger=None
-            )
-
-            self.signals.progress.emit(self.video_idx)
-        except Exception as e:
-            self.signals.error.emit(f"Error in video {self.video_idx}: {e}")
-        self.signals.finished.emit()
+                final_clip = main_clip
+        else:
+            if closing_clip:
+                clips.append(closing_clip)
+            # Every clip is already width x height, so plain chaining is enough.
+            final_clip = concatenate_videoclips(clips, method="chain")
+
+        # Attach audio if available, looping or trimming the pre-decoded PCM in memory.
+        if audio_pcm:
+            pcm = np.load(audio_pcm, mmap_mode="r")
+            n_samples = int(round(final_clip.duration * AUDIO_FPS))
+            if 0 < len(pcm) < n_samples:
+                pcm = np.tile(pcm, (-(-n_samples // len(pcm)), 1))
+            if len(pcm):
+                final_clip = final_clip.set_audio(AudioArrayClip(pcm[:n_samples], fps=AUDIO_FPS))
+
+        output_path = os.path.join(output_folder, f"video_{video_idx}.mp4")
+        final_clip.write_videofile(
+            output_path,
+            fps=30,
+            codec=export_params["video_codec"],
+            audio_codec="aac",
+            preset=ENCODER_PRESET,
+            ffmpeg_params=export_params["ffmpeg_params"],
+            verbose=False,
+            logger=None
+        )
+        # Same files and the same soundtrack give a byte-identical video, so copy it instead of
+        # encoding it again.
+        for copy_idx in copy_to:
+            shutil.copyfile(output_path, os.path.join(output_folder, f"video_{copy_idx}.mp4"))
+    except Exception as e:
+        return video_idx, f"Error in video {video_idx}: {e}"
+    return video_idx, None
 
 # --------------------- Main UI Class ---------------------
 class CSVAudioTool(QWidget):
@@ -189,8 +450,33 @@ class CSVAudioTool(QWidget):
         self.setWindowTitle("CSV and Audio Loader Tool")
         self.setFixedSize(800, 600)
         self.df = None
-        self.threadpool = QThreadPool()
-        self.threadpool.setMaxThreadCount(3)
+        cpu_count = os.cpu_count() or 2
+        # CPU side: each video is encoded in its own process so MoviePy's Python-side frame work
+        # is not serialised by the GIL. Half the cores leaves room for ffmpeg's own threads.
+        self.cpu_workers = max(1, cpu_count // 2)
+        self.encode_workers = self.cpu_workers
+        self.executor = None
+        # I/O side: cache warming is disk reads/writes plus short OpenCV calls that release the
+        # GIL, so it can run more threads than there are cores (resized per export, see
+        # start_export, to avoid seek thrashing on spinning disks).
+        self.io_threads = min(8, cpu_count * 2)
+        self.io_pool = QThreadPool()
+        self.io_pool.setMaxThreadCount(self.io_threads)
+        self.preparation_remaining = 0
+        self.pending_videos = deque()
+        self.export_params = None
+        self.cache_files = {}
+        # Bumped on every start/cancel; signals from jobs and tasks of an earlier export are dropped.
+        self.export_generation = 0
+        self.signals = None
+        # Probe hardware encoders in the background at startup; an export that gets to the
+        # encoding stage first waits for the result (see start_encoding).
+        self.video_encoder = None
+        self.waiting_for_encoder = False
+        probe_task = EncoderProbeTask()
+        probe_task.signals.finished.connect(self.on_encoder_detected)
+        # Kept off io_pool, which may be capped to one thread on a spinning disk.
+        QThreadPool.globalInstance().start(probe_task)
         self.tasks_finished = 0
         self.total_tasks = 0
         self.setupUI()
@@ -312,6 +598,24 @@ class CSVAudioTool(QWidget):
         if folder_path:
             self.output_folder_label.setText(folder_path)
 
+    def current_export_only(self, generation, handler):
+        """
+        Wrap handler so it ignores signals from an earlier export, e.g. from jobs or preprocess
+        tasks that were still running when that export was cancelled.
+        """
+        def slot(*args):
+            if generation == self.export_generation:
+                handler(*args)
+        return slot
+
+    def make_export_signals(self, generation):
+        signals = WorkerSignals()
+        signals.progress.connect(self.current_export_only(generation, self.on_task_progress))
+        signals.error.connect(self.current_export_only(generation, self.on_task_error))
+        signals.finished.connect(self.current_export_only(generation, self.on_task_finished))
+        signals.job_done.connect(self.current_export_only(generation, self.submit_next_video))
+        return signals
+
     def start_export(self):
         if self.df is None or self.df.empty:
             self.show_error("Please load a valid CSV first.")
@@ -333,10 +637,20 @@ class CSVAudioTool(QWidget):
         # Pre-filter files by category.
         category = self.category_combo.currentText()
         files_list = self.df[self.df["Category"] == category]["File"].dropna().tolist()
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        files_list = resolve_files(base_dir, files_list)
         if not files_list:
             self.show_error("No files found for the selected category.")
             return
 
+        closing_image = self.closing_image_label.text() if self.closing_image_label.text() != "No closing image selected" else None
+        if closing_image:
+            closing_image = (resolve_files(base_dir, [closing_image]) or [None])[0]
+
+        audio_file = self.audio_label.text() if self.audio_label.text() != "No audio selected" else None
+        if audio_file and not os.path.isfile(audio_file):
+            audio_file = None
+
         export_params = {
             "images_per_video": self.image_spinbox.value(),
             "output_videos": self.output_videos_spinbox.value(),
@@ -344,12 +658,16 @@ class CSVAudioTool(QWidget):
             "height": height,
             "per_image_time": self.time_slider.value(),
             "fade_duration": 1,    # Must be less than per_image_time for a smooth fade.
-            "audio_file": self.audio_label.text() if self.audio_label.text() != "No audio selected" else None,
+            "audio_pcm": None,     # Filled in once the soundtrack has been decoded.
             "output_folder": output_folder,
             "crossfade": True,     # Enable crossfade transitions.
-            "closing_image": self.closing_image_label.text() if self.closing_image_label.text() != "No closing image selected" else None
+            "closing_image": closing_image
         }
 
+        self.export_generation += 1
+        generation = self.export_generation
+        self.signals = self.make_export_signals(generation)
+        self.waiting_for_encoder = False
         self.total_tasks = export_params["output_videos"]
         self.tasks_finished = 0
 
@@ -360,15 +678,134 @@ class CSVAudioTool(QWidget):
         self.progress_dialog.canceled.connect(self.cancel_export)
         self.progress_dialog.show()
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
+        # Each video's files are picked here so workers only receive their own short list.
+        self.export_params = export_params
+        self.pending_videos = deque(group_duplicate_videos([
+            (video_idx, sample_files_for_video(files_list, export_params["images_per_video"]))
+            for video_idx in range(1, export_params["output_videos"] + 1)
+        ]))
+        # Resize every distinct image once, in parallel, before any video is built, so export
+        # jobs only read the cache and an image shared by several videos is processed once.
+        unique_sources = {file_path for _, sample_files, _ in self.pending_videos
+                          for file_path in sample_files if not is_video_file(file_path)}
+        if closing_image:
+            unique_sources.add(closing_image)
+        self.cache_files = image_cache_files(unique_sources, width, height)
+        # Parallel reads on a spinning disk only add seeks, so preprocess one file at a time if
+        # any directory the prepass reads from or writes to is on one.
+        prepass_dirs = {DISK_CACHE_DIR} | {os.path.dirname(path) for path in unique_sources}
+        if audio_file:
+            prepass_dirs.add(os.path.dirname(audio_file))
+        on_hdd = any(is_rotational_disk(path) for path in prepass_dirs)
+        self.io_pool.setMaxThreadCount(1 if on_hdd else self.io_threads)
+        # Encoding starts once every image is cached and the soundtrack (decoded once here rather
+        # than once per video in every worker) is ready.
+        self.preparation_remaining = len(unique_sources) + (1 if audio_file else 0)
+        if not self.preparation_remaining:
+            self.start_encoding()
+            return
+        self.progress_dialog.setLabelText("Preparing audio and images..." if audio_file else "Preparing images...")
+        if audio_file:
+            audio_task = AudioDecodeTask(audio_file)
+            audio_task.signals.error.connect(self.current_export_only(generation, self.on_audio_failed))
+            audio_task.signals.finished.connect(
+                self.current_export_only(generation, partial(self.on_audio_decoded, audio_task)))
+            self.io_pool.start(audio_task)
+        for file_path in sorted(unique_sources):
+            task = PreprocessTask(file_path, width, height, self.cache_files[file_path])
+            task.signals.finished.connect(self.current_export_only(generation, self.on_preparation_finished))
+            self.io_pool.start(task)
+
+    def on_audio_decoded(self, audio_task):
+        if audio_task.audio_pcm is None:
+            return  # Failed; on_audio_failed has already stopped the export.
+        self.export_params["audio_pcm"] = audio_task.audio_pcm
+        self.on_preparation_finished()
+
+    def on_audio_failed(self, message):
+        self.stop_export()
+        # hide() rather than close(): closing a QProgressDialog emits canceled.
+        self.progress_dialog.hide()
+        self.show_error(message)
 
-        # Launch a task for each video.
-        for video_idx in range(1, export_params["output_videos"] + 1):
-            task = VideoExportTask(base_dir, files_list, export_params, video_idx)
-            task.signals.progress.connect(self.on_task_progress)
-            task.signals.error.connect(self.on_task_error)
-            task.signals.finished.connect(self.on_task_finished)
-            self.threadpool.start(task)
+    def on_preparation_finished(self):
+        self.preparation_remaining -= 1
+        if self.preparation_remaining == 0:
+            self.start_encoding()
+
+    def on_encoder_detected(self):
+        self.video_encoder = detect_video_encoder()
+        if self.waiting_for_encoder:
+            self.waiting_for_encoder = False
+            self.start_encoding()
+
+    def start_encoding(self):
+        if not self.pending_videos:
+            return  # Cancelled while preprocessing.
+        if self.video_encoder is None:
+            # The startup encoder probe is still running; on_encoder_detected resumes from here.
+            self.waiting_for_encoder = True
+            self.progress_dialog.setLabelText("Checking video encoders...")
+            return
+        self.progress_dialog.setLabelText("Exporting videos...")
+        video_codec, ffmpeg_params = self.video_encoder
+        self.export_params["video_codec"] = video_codec
+        self.export_params["ffmpeg_params"] = ffmpeg_params
+        # Consumer GPUs only allow a few concurrent hardware encode sessions.
+        self.encode_workers = self.cpu_workers if video_codec == SOFTWARE_ENCODER[0] else min(self.cpu_workers, 2)
+        # Launch a job for each video. "spawn" keeps the workers free of the parent's Qt state
+        # and behaves the same on every platform.
+        self.executor = ProcessPoolExecutor(max_workers=self.encode_workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        # Only keep a couple of jobs queued per worker; the rest are fed in as videos finish so
+        # a large batch does not pin every job's frames and temp output at once.
+        for _ in range(self.encode_workers * 2):
+            self.submit_next_video()
+
+    def submit_next_video(self):
+        if self.executor is None or not self.pending_videos:
+            return
+        video_idx, sample_files, copy_to = self.pending_videos.popleft()
+        job_files = list(sample_files) + [self.export_params["closing_image"]]
+        cache_files = {path: self.cache_files[path] for path in job_files if path in self.cache_files}
+        try:
+            future = self.executor.submit(export_one, sample_files, cache_files, self.export_params,
+                                          video_idx, copy_to)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # The pool died (a worker was killed) or was already shut down. An exception escaping
+            # a Qt slot aborts the whole app, so fail every video still waiting instead, which
+            # lets the progress dialog complete.
+            failed = [video_idx] + copy_to
+            while self.pending_videos:
+                pending_idx, _, pending_copies = self.pending_videos.popleft()
+                failed += [pending_idx] + pending_copies
+            self.on_task_error(f"Could not start videos {', '.join(map(str, sorted(failed)))}: {e}")
+            for _ in failed:
+                self.on_task_finished()
+            return
+        # Bind this export's signals so a job finishing after a cancel cannot touch a newer export.
+        future.add_done_callback(partial(self.on_future_done, self.signals, [video_idx] + copy_to))
+
+    def on_future_done(self, signals, video_idxs, future):
+        # Runs on the executor's management thread, so only emit signals from here.
+        if future.cancelled():
+            return
+        try:
+            _, error = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            # The worker process itself died (e.g. killed or out of memory).
+            error = f"Export worker failed: {e}"
+        # Feed the next job once per completed job, not once per video it produced, so copies of
+        # duplicate videos do not push more jobs than the submission limit into the pool.
+        signals.job_done.emit()
+        if error:
+            signals.error.emit(error)
+        for video_idx in video_idxs:
+            if not error:
+                signals.progress.emit(video_idx)
+            signals.finished.emit()
 
     def on_task_progress(self, video_idx):
         print(f"Video {video_idx} completed.")
@@ -381,10 +818,19 @@ class CSVAudioTool(QWidget):
         self.progress_dialog.setValue(self.tasks_finished)
         if self.tasks_finished >= self.total_tasks:
             self.progress_dialog.close()
+            self.executor.shutdown(wait=False)
             QMessageBox.information(self, "Export Completed", "Video export process has completed.")
 
+    def stop_export(self):
+        self.export_generation += 1
+        self.io_pool.clear()
+        self.pending_videos.clear()
+        if self.executor is not None:
+            # Drop queued videos; ones already encoding run to completion.
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
     def cancel_export(self):
-        self.threadpool.clear()
+        self.stop_export()
         QMessageBox.information(self, "Cancelled", "Export cancelled.")
 
     def update_slider_value(self, value):
@@ -398,6 +844,8 @@ class CSVAudioTool(QWidget):
         msg.exec_()
 
 if __name__ == "__main__":
+    # Needed for the worker processes when the tool is frozen into a Windows executable.
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = CSVAudioTool()
     window.show()